@@ -0,0 +1,51 @@
+"""
+Benchmark the indicator pack on synthetic OHLCV data.
+
+Run from the repository root:
+    python benchmarks/bench_indicators.py [max_rows]
+
+Prints the time to compute every indicator at growing row counts; the time
+per row should stay roughly constant up to 10M rows.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import INDICATOR_COLUMNS, compute_indicators
+
+
+def make_ohlcv(rows, seed=0):
+    """Generate a random-walk OHLCV dataframe with `rows` rows."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    spread = rng.uniform(0, 0.5, rows)
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.1, rows),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, rows).astype("float64"),
+    })
+
+
+def main(max_rows=10_000_000, repeats=3):
+    rows = 100_000
+    print(f"{'rows':>12} {'seconds':>10} {'ns/row':>10}")
+    while rows <= max_rows:
+        df = make_ohlcv(rows)
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            compute_indicators(df, list(INDICATOR_COLUMNS))
+            best = min(best, time.perf_counter() - start)
+        print(f"{rows:>12,} {best:>10.3f} {best / rows * 1e9:>10.1f}")
+        rows *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,271 @@
+"""
+Load-test the dashboard by replaying interaction sequences from many simulated sessions.
+
+Run from the repository root:
+    python benchmarks/loadtest.py --sessions 8 --rows 20000
+
+Each session drives main.py headlessly through Streamlit's AppTest, in its own
+thread of this process, so sessions share the dataset cache exactly as they
+would on one server. Every interaction triggers a rerun, whose latency is
+recorded. The report gives rerun latency percentiles, throughput,
+the marginal memory of one more session and the shared dataset cache usage.
+
+Scenarios are JSON lists of steps, e.g.
+    [{"action": "upload"},
+     {"action": "set_dates", "start": "2020-03-01", "end": "2020-09-30"},
+     {"action": "toggle", "label": "Candlestick Chart", "value": true},
+     {"action": "toggle_all", "value": true}]
+"upload" selects one of the synthetic files; the page is opened without a file first.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test
+from streamlit.testing.v1.util import patch_config_options
+
+# Session state keys read by the session script
+UPLOAD_KEY = "_loadtest_upload"
+APP_DIR_KEY = "_loadtest_app_dir"
+
+DEFAULT_SCENARIO = [
+    {"action": "upload"},
+    {"action": "toggle", "label": "Candlestick Chart", "value": True},
+    {"action": "toggle", "label": "Line Chart", "value": True},
+    {"action": "set_dates", "start_fraction": 0.25, "end_fraction": 0.75},
+    {"action": "toggle_all", "value": True},
+    {"action": "set_dates", "start_fraction": 0.0, "end_fraction": 1.0},
+]
+
+
+def _session_script():
+    """
+    The script each simulated session runs: main.py with the file uploader fed from session state.
+
+    AppTest cannot upload files, so the uploader returns the synthetic file
+    chosen by the harness; the patch is identical for every session. Like a
+    real upload, the file is read once per session and carries a file_id.
+    AppTest runs this function's source on its own, so the session state keys
+    are spelled out rather than taken from the module constants.
+    """
+    import io
+    import runpy
+    import sys
+
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+
+    app_dir = st.session_state["_loadtest_app_dir"]
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+
+    def file_uploader(self, label, *args, **kwargs):
+        path = st.session_state.get("_loadtest_upload")
+        if path is None:
+            return None
+        if st.session_state.get("_loadtest_upload_path") != path:
+            with open(path, "rb") as f:
+                st.session_state["_loadtest_upload_data"] = f.read()
+            st.session_state["_loadtest_upload_path"] = path
+        uploaded = io.BytesIO(st.session_state["_loadtest_upload_data"])
+        uploaded.name = path
+        uploaded.file_id = path
+        return uploaded
+
+    DeltaGenerator.file_uploader = file_uploader
+    runpy.run_path(f"{app_dir}/main.py", run_name="__main__")
+
+
+class _RuntimeHolder:
+    """Absorbs AppTest's per-run swaps of the global runtime (see install_shared_runtime)."""
+
+    _instance = None
+
+
+def install_shared_runtime():
+    """
+    Give all simulated sessions one runtime, as on a real server.
+
+    AppTest installs a fresh mock runtime as a process global for every run
+    and clears it afterwards, which breaks runs happening at the same time.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = _RuntimeHolder
+
+
+def make_ohlcv_csv(path, rows, seed=0):
+    """Write a synthetic hourly OHLCV CSV file with `rows` rows."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    spread = rng.uniform(0, 1, rows)
+    pd.DataFrame({
+        "date": pd.date_range("2015-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S"),
+        "open": close + rng.normal(0, 0.2, rows),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, rows),
+    }).to_csv(path, index=False)
+
+
+def _widget(widgets, label):
+    """Return the widget with the given label."""
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise ValueError(f"No widget labelled {label!r} on the page.")
+
+
+def _apply(at, step, upload_path, full_range):
+    """Apply one scenario step to a session before its rerun."""
+    action = step["action"]
+    if action == "upload":
+        at.session_state[UPLOAD_KEY] = upload_path
+    elif action == "toggle":
+        _widget(at.toggle, step["label"]).set_value(step.get("value", True))
+    elif action == "toggle_all":
+        for toggle in at.toggle:
+            toggle.set_value(step.get("value", True))
+    elif action == "set_dates":
+        start_input, end_input = _widget(at.date_input, "Start Date"), _widget(at.date_input, "End Date")
+        if "start" in step:
+            start, end = pd.Timestamp(step["start"]), pd.Timestamp(step["end"])
+        else:
+            # Fractions of the file's full range, which the pickers show right after the upload
+            if not full_range:
+                full_range.extend([pd.Timestamp(start_input.value), pd.Timestamp(end_input.value)])
+            first, last = full_range
+            start = first + (last - first) * step["start_fraction"]
+            end = first + (last - first) * step["end_fraction"]
+        start_input.set_value(start.date())
+        end_input.set_value(end.date())
+    else:
+        raise ValueError(f"Unknown scenario action: {action}")
+
+
+def run_session(scenario, upload_path, timeout):
+    """
+    Replay a scenario in a new session.
+
+    Returns the (action, seconds) of every rerun, the error messages shown
+    by the app and the finished AppTest (which keeps the session alive).
+    """
+    at = AppTest.from_function(_session_script, default_timeout=timeout)
+    at.session_state[APP_DIR_KEY] = APP_DIR
+    timings = []
+    full_range = []
+
+    start = time.perf_counter()
+    at.run()
+    timings.append(("open", time.perf_counter() - start))
+
+    for step in scenario:
+        _apply(at, step, upload_path, full_range)
+        start = time.perf_counter()
+        at.run()
+        timings.append((step["action"], time.perf_counter() - start))
+
+    errors = [element.value for element in at.exception] + [element.value for element in at.error]
+    return timings, errors, at
+
+
+def _percentiles(seconds):
+    """Format p50/p90/p99/max of a list of latencies in milliseconds."""
+    p50, p90, p99 = np.percentile(seconds, [50, 90, 99]) * 1000
+    return f"p50 {p50:8.0f}  p90 {p90:8.0f}  p99 {p99:8.0f}  max {max(seconds) * 1000:8.0f} ms"
+
+
+def measure_session_memory(scenario, upload_path, timeout):
+    """Return the memory retained by one more session replaying the scenario, in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        _, _, session = run_session(scenario, upload_path, timeout)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del session
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8, help="number of concurrent simulated sessions")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows per synthetic file")
+    parser.add_argument("--datasets", type=int, default=1, help="number of distinct synthetic files sessions upload")
+    parser.add_argument("--scenario", help="JSON file with the interaction steps to replay")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per rerun")
+    args = parser.parse_args()
+
+    scenario = DEFAULT_SCENARIO
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+
+    # main.py refers to its assets relative to the app directory
+    os.chdir(APP_DIR)
+    install_shared_runtime()
+
+    with tempfile.TemporaryDirectory() as data_dir, patch_config_options({"global.appTest": True}):
+        paths = [os.path.join(data_dir, f"synthetic_{i}.csv") for i in range(args.datasets)]
+        for seed, path in enumerate(paths):
+            make_ohlcv_csv(path, args.rows, seed=seed)
+
+        print(f"{args.sessions} sessions, {args.datasets} dataset(s) of {args.rows:,} rows, "
+              f"{len(scenario)} steps per session")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            results = list(pool.map(
+                lambda i: run_session(scenario, paths[i % len(paths)], args.timeout),
+                range(args.sessions),
+            ))
+        wall = time.perf_counter() - start
+
+        timings = [timing for session_timings, _, _ in results for timing in session_timings]
+        errors = [error for _, session_errors, _ in results for error in session_errors]
+        seconds = [elapsed for _, elapsed in timings]
+
+        print(f"\nreruns: {len(seconds)} in {wall:.1f}s, throughput {len(seconds) / wall:.2f} reruns/s")
+        print(f"{'all':>12}  {_percentiles(seconds)}")
+        for action in dict.fromkeys(action for action, _ in timings):
+            print(f"{action:>12}  {_percentiles([elapsed for a, elapsed in timings if a == action])}")
+        print(f"errors shown by the app: {len(errors)}")
+        for error in dict.fromkeys(errors):
+            print(f"  {error.splitlines()[0]}")
+
+        # Measured with the other sessions still alive, so datasets are already cached
+        retained = measure_session_memory(scenario, paths[0], args.timeout)
+        print(f"\nmemory retained by one more session: {retained / 1024 ** 2:.1f} MiB")
+
+        from dataset_cache import get_dataset_cache
+        stats = get_dataset_cache().stats()
+        print(f"shared dataset cache: {stats['datasets']} dataset(s), {stats['nbytes'] / 1024 ** 2:.1f} MiB "
+              f"of {stats['max_bytes'] / 1024 ** 2:.0f} MiB, {stats['in_use']} in use")
+
+
+if __name__ == "__main__":
+    main()
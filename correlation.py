@@ -0,0 +1,230 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+# Columns identifying the asset of each row in a multi-asset (long format) file
+TICKER_COLUMNS = ["ticker", "symbol"]
+
+# One incremental update costs about as much as recomputing this many rows with BLAS,
+# so sliding a window only beats recomputing it when it advances by fewer rows than window / cost
+INCREMENTAL_ROW_COST = 32
+
+
+def returns_matrix(df, ticker_column, value_column="close"):
+    """
+    Pivot a long multi-asset dataframe into a date x ticker matrix of simple returns.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe with 'date', the ticker column and the value column.
+        ticker_column (str): The column identifying the asset of each row.
+        value_column (str): The price column the returns are computed from (default: 'close').
+    """
+    prices = df.pivot_table(index="date", columns=ticker_column, values=value_column, aggfunc="last")
+    return prices.sort_index().pct_change(fill_method=None).iloc[1:]
+
+
+def correlation_matrix(values):
+    """
+    Compute the Pearson correlation matrix of the columns of a 2-D array.
+
+    Each pair of series is correlated over the rows where both are present.
+    The pairwise counts, sums and cross-products come from masked matrix
+    products, one BLAS call each, instead of a loop over pairs.
+
+    Parameters:
+        values (np.ndarray): An (observations x series) array.
+    """
+    values = np.asarray(values, dtype="float64")
+    present = ~np.isnan(values)
+    mask = present.astype("float64")
+    # Centering on each column's mean keeps the sums of squares well conditioned
+    x = np.where(present, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = x.sum(axis=0) / present.sum(axis=0)
+    x = np.where(present, x - np.nan_to_num(mean), 0.0)
+
+    # Entry [i, j] of each product sums over the rows where series i and j are both present
+    n = mask.T @ mask
+    sum_i = x.T @ mask
+    sum_sq_i = (x * x).T @ mask
+    cross = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = cross - sum_i * sum_i.T / n
+        var_i = sum_sq_i - sum_i ** 2 / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+
+    # Pairs with fewer than two shared rows or a constant series have no defined correlation
+    corr[(n < 2) | ~(var_i > 0) | ~(var_i.T > 0)] = np.nan
+    np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+    return np.clip(corr, -1.0, 1.0)
+
+
+class RollingCorrelation:
+    """
+    Correlation matrix over a sliding window of observations, updated incrementally.
+
+    Each update adds the new row to and removes the oldest row from running
+    sums and cross-products, costing O(k^2) for k series instead of a full
+    recomputation. Rows are shifted by a reference point before being
+    accumulated, and the sums are rebuilt around the window mean every
+    `window` updates to keep floating-point drift bounded.
+
+    Parameters:
+        window (int): The number of observations in the window.
+    """
+
+    def __init__(self, window):
+        if window < 2:
+            raise ValueError("The rolling window must contain at least two observations.")
+        self.window = window
+        self._rows = deque()
+        self._shift = None
+        self._sum = None
+        self._cross = None
+        self._updates = 0
+
+    def update(self, row):
+        """Add one complete observation (a 1-D array with one value per series)."""
+        row = np.asarray(row, dtype="float64")
+        if self._sum is None:
+            self._shift = row.copy()
+            self._sum = np.zeros(len(row))
+            self._cross = np.zeros((len(row), len(row)))
+
+        self._rows.append(row)
+        new = row - self._shift
+        self._sum += new
+        self._cross += np.outer(new, new)
+        if len(self._rows) > self.window:
+            old = self._rows.popleft() - self._shift
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._rebuild()
+
+    def extend(self, values):
+        """Add the rows of an (observations x series) array in order; an empty window is filled in one pass."""
+        values = np.asarray(values, dtype="float64")
+        if not self._rows and len(values):
+            self._rows.extend(values[:self.window])
+            self._rebuild()
+            values = values[self.window:]
+        for row in values:
+            self.update(row)
+
+    def matrix(self):
+        """Return the correlation matrix of the current window."""
+        n = len(self._rows)
+        if n < 2:
+            return None
+        cov = (self._cross - np.outer(self._sum, self._sum) / n) / (n - 1)
+        std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0)
+
+    def _rebuild(self):
+        """Recompute the running sums from the rows in the window."""
+        rows = np.array(self._rows)
+        self._shift = rows.mean(axis=0)
+        rows -= self._shift
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+
+
+def rolling_correlation(values, window, step=1):
+    """
+    Yield (end_row, correlation matrix) for windows ending every `step` rows, the last one on the final row.
+
+    Rows with missing values are dropped, so windows span complete observations
+    and `end_row` counts complete rows.
+
+    Parameters:
+        values (np.ndarray): An (observations x series) array.
+        window (int): The number of observations in each window.
+        step (int): The number of rows between successive matrices (default: 1).
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values).any(axis=1)]
+    rolling = RollingCorrelation(window)
+    rolling.extend(values[:window - 1])
+    for end_row in range(window, len(values) + 1):
+        rolling.update(values[end_row - 1])
+        if (len(values) - end_row) % step == 0:
+            yield end_row, rolling.matrix()
+
+
+def cluster_order(corr):
+    """
+    Return the series order that places strongly correlated series next to each other.
+
+    Uses average-linkage hierarchical clustering on the distance 1 - correlation.
+    """
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    distance = 1.0 - np.nan_to_num(corr)
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    return leaves_list(linkage(squareform(np.clip(distance, 0.0, 2.0), checks=False), method="average"))
+
+
+def correlation_frame(df, columns):
+    """
+    Return the correlation matrix of dataframe columns, hierarchically ordered.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe with the series as columns.
+        columns (list): The columns to correlate.
+    """
+    corr = correlation_matrix(df[columns].to_numpy(dtype="float64"))
+    order = cluster_order(corr)
+    labels = [columns[i] for i in order]
+    return pd.DataFrame(corr[np.ix_(order, order)], index=labels, columns=labels)
+
+
+def rolling_correlation_frames(df, columns, window, frames, labels=None):
+    """
+    Return the correlation matrices of up to `frames` trailing windows spread evenly up to the last row.
+
+    Windows that overlap heavily are slid incrementally with RollingCorrelation
+    over just the rows they span; otherwise each window is one direct BLAS
+    computation. All windows share the hierarchical order of the latest one.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe with the series as columns.
+        columns (list): The columns to correlate.
+        window (int): The number of complete rows in each window.
+        frames (int): The maximum number of windows returned.
+        labels (array-like): A label per row of `df` naming the windows (default: the index).
+
+    Returns:
+        list: (label of the window's last row, pd.DataFrame) pairs, oldest first;
+        empty when there are fewer than `window` complete rows.
+    """
+    values = df[columns].to_numpy(dtype="float64")
+    complete = ~np.isnan(values).any(axis=1)
+    row_labels = pd.Index(df.index if labels is None else labels)[complete]
+    count = int(complete.sum())
+    if window < 2 or count < window:
+        return []
+
+    values = values[complete]
+    step = max((count - window) // max(frames - 1, 1), 1)
+    ends = count - step * np.arange(min(frames, (count - window) // step + 1))[::-1]
+    if step * INCREMENTAL_ROW_COST < window:
+        first = ends[0] - window
+        matrices = [(first + end_row, corr) for end_row, corr in rolling_correlation(values[first:], window, step)]
+    else:
+        matrices = [(end, correlation_matrix(values[end - window:end])) for end in ends]
+    order = cluster_order(matrices[-1][1])
+    ordered = [columns[i] for i in order]
+    return [
+        (row_labels[end_row - 1], pd.DataFrame(corr[np.ix_(order, order)], index=ordered, columns=ordered))
+        for end_row, corr in matrices
+    ]
@@ -1,4 +1,14 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from date_parsing import ensure_datetime, parse_dates
+
+# Columns every uploaded file must provide
+REQUIRED_COLUMNS = ["date", "close", "volume", "open", "high", "low"]
+
+# Columns that must hold numbers
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "volume"]
 
 def read_csv(file):
     """Read the uploaded CSV file."""
@@ -8,6 +18,182 @@ def read_csv(file):
     except Exception as e:
         raise ValueError(f"Error reading the file: {e}")
 
-def validate_columns(df, required_columns):
-    """Validate if the required columns exist in the dataframe."""
-    return all(col in df.columns for col in required_columns)
+def read_csv_chunks(file, chunksize):
+    """Read the uploaded CSV file as an iterator of dataframes with `chunksize` rows each."""
+    try:
+        yield from pd.read_csv(file, chunksize=chunksize)
+    except Exception as e:
+        raise ValueError(f"Error reading the file: {e}")
+
+def load_dataset(file, required_columns=REQUIRED_COLUMNS, chunksize=None, date_column="date"):
+    """
+    Read the uploaded CSV file, parse its date column and validate it in a single pass.
+
+    Parameters:
+        file: The CSV file (path or file-like object).
+        required_columns (list): The columns the file must contain.
+        chunksize (int): Read, parse and validate the file this many rows at a time (default: all at once).
+        date_column (str): The column holding the dates (default: 'date').
+
+    Returns:
+        tuple: The dataframe and its ValidationReport.
+    """
+    chunks = [read_csv(file)] if chunksize is None else read_csv_chunks(file, chunksize)
+    validator = DatasetValidator(required_columns, date_column=date_column)
+    frames = []
+    for chunk in chunks:
+        if date_column in chunk.columns:
+            chunk[date_column] = parse_dates(chunk[date_column])
+        validator.update(chunk)
+        # Values the report flagged as non-numeric become NaN, as unparseable dates become NaT
+        for col in NUMERIC_COLUMNS:
+            if col in chunk.columns and not is_numeric_dtype(chunk[col].dtype):
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        frames.append(chunk)
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return df, validator.finish()
+
+
+class ValidationReport:
+    """
+    Compact summary of the data-quality problems found in a dataset.
+
+    Besides the problem counts it records the properties later stages rely on:
+    `is_sorted` (every date is present and dates never decrease) and
+    `unique_dates` (no date repeats).
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.missing_columns = []
+        self.missing_values = {}
+        self.non_numeric_values = {}
+        self.missing_dates = 0
+        self.unsorted_rows = 0
+        self.duplicate_dates = 0
+        self.high_below_low = 0
+        self.negative_volume = 0
+
+    @property
+    def is_valid(self):
+        """Whether the dataset can be used at all (all required columns are present)."""
+        return not self.missing_columns
+
+    @property
+    def has_dates(self):
+        """Whether at least one row has a valid date."""
+        return self.rows > self.missing_dates
+
+    @property
+    def is_sorted(self):
+        # Binary searches on the date column are only valid without NaT
+        return self.unsorted_rows == 0 and self.missing_dates == 0
+
+    @property
+    def unique_dates(self):
+        return self.duplicate_dates == 0
+
+    def issues(self):
+        """Return one human-readable line per problem found."""
+        issues = []
+        if self.missing_columns:
+            issues.append(f"Missing columns: {', '.join(self.missing_columns)}")
+        for col, count in self.missing_values.items():
+            if count:
+                issues.append(f"missing or unparseable values in '{col}': {count:,}")
+        for col, count in self.non_numeric_values.items():
+            if count:
+                issues.append(f"non-numeric values in '{col}': {count:,}")
+        if self.unsorted_rows:
+            issues.append(f"rows dated earlier than the previous row: {self.unsorted_rows:,}")
+        if self.duplicate_dates:
+            issues.append(f"duplicate dates: {self.duplicate_dates:,}")
+        if self.high_below_low:
+            issues.append(f"rows with high below low: {self.high_below_low:,}")
+        if self.negative_volume:
+            issues.append(f"rows with negative volume: {self.negative_volume:,}")
+        return issues
+
+
+class DatasetValidator:
+    """
+    Validates a dataset chunk by chunk with vectorized checks, carrying state across chunk boundaries.
+
+    Parameters:
+        required_columns (list): The columns the dataset must contain.
+        date_column (str): The column holding parsed dates (default: 'date').
+    """
+
+    def __init__(self, required_columns, date_column="date"):
+        self.required_columns = list(required_columns)
+        self.date_column = date_column
+        self.report = ValidationReport()
+        self._columns_checked = False
+        self._last_date = None
+        self._dates = []
+
+    def update(self, chunk):
+        """Check one chunk of rows."""
+        report = self.report
+        if not self._columns_checked:
+            report.missing_columns = [col for col in self.required_columns if col not in chunk.columns]
+            self._columns_checked = True
+        report.rows += len(chunk)
+
+        for col in self.required_columns:
+            if col in chunk.columns:
+                report.missing_values[col] = report.missing_values.get(col, 0) + int(chunk[col].isna().sum())
+
+        numbers = {col: self._numeric(chunk, col) for col in NUMERIC_COLUMNS if col in chunk.columns}
+        if "high" in numbers and "low" in numbers:
+            report.high_below_low += int((numbers["high"] < numbers["low"]).sum())
+        if "volume" in numbers:
+            report.negative_volume += int((numbers["volume"] < 0).sum())
+
+        if self.date_column in chunk.columns:
+            self._check_dates(chunk[self.date_column])
+        return self
+
+    def _numeric(self, chunk, col):
+        """Return a column as numbers, counting values that are present but not numeric."""
+        values = chunk[col]
+        if is_numeric_dtype(values.dtype):
+            return values
+        numbers = pd.to_numeric(values, errors="coerce")
+        report = self.report
+        report.non_numeric_values[col] = (
+            report.non_numeric_values.get(col, 0) + int((numbers.isna() & values.notna()).sum())
+        )
+        return numbers
+
+    def _check_dates(self, dates):
+        """Count missing, out-of-order and repeated dates; order checks skip the missing ones."""
+        values = ensure_datetime(dates).to_numpy(dtype="datetime64[ns]")
+        missing = np.isnat(values)
+        self.report.missing_dates += int(missing.sum())
+        values = values[~missing].view("int64")
+        if len(values) == 0:
+            return
+        if self._last_date is not None:
+            values_with_previous = np.r_[self._last_date, values]
+        else:
+            values_with_previous = values
+        steps = np.diff(values_with_previous)
+        self.report.unsorted_rows += int((steps < 0).sum())
+        self.report.duplicate_dates += int((steps == 0).sum())
+        self._last_date = values[-1]
+        self._dates.append(values)
+
+    def finish(self):
+        """Return the report once every chunk has been checked."""
+        if self.report.unsorted_rows and self._dates:
+            # Adjacent comparisons only find every duplicate when the dates are sorted
+            dates = np.concatenate(self._dates)
+            self.report.duplicate_dates = len(dates) - len(np.unique(dates))
+        self._dates = []
+        return self.report
+
+
+def validate_dataset(df, required_columns=REQUIRED_COLUMNS, date_column="date"):
+    """Validate a whole dataframe in one pass and return its ValidationReport."""
+    return DatasetValidator(required_columns, date_column=date_column).update(df).finish()
@@ -0,0 +1,241 @@
+import hashlib
+import io
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from data_processing import load_dataset
+
+# Global memory cap for all cached datasets (1 GiB)
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Session state key holding the session's reference to its shared dataset
+SESSION_HANDLE_KEY = "_dataset_handle"
+
+# Session state key holding the upload id the session's handle was loaded from
+SESSION_FILE_ID_KEY = "_dataset_file_id"
+
+
+def content_hash(data):
+    """Return a hex digest identifying the raw file content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def frame_nbytes(df):
+    """Return the in-memory size of a dataframe in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _artifact_nbytes(value):
+    """Return the memory footprint of a derived artifact, if it reports one."""
+    if isinstance(value, pd.DataFrame):
+        return frame_nbytes(value)
+    return int(getattr(value, "nbytes", 0))
+
+
+class _Entry:
+    """A cached dataset, the artifacts derived from it, its size and number of active users."""
+
+    def __init__(self, key, frame, nbytes):
+        self.key = key
+        self.frame = frame
+        self.nbytes = nbytes
+        self.refcount = 0
+        self.artifacts = {}
+
+
+class DatasetHandle:
+    """
+    A session's reference to a shared dataset.
+
+    The handle keeps the cached frame pinned until `release` is called or the
+    handle is garbage collected (e.g. when the Streamlit session ends).
+    The frame is shared by every session and must never be modified in place;
+    filters and charts operate on views derived from it.
+    """
+
+    def __init__(self, cache, entry):
+        self.key = entry.key
+        self.frame = entry.frame
+        self._cache = cache
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, cache._release, entry)
+
+    def artifact(self, name, builder):
+        """
+        Return a structure derived from the dataset, building it once per dataset.
+
+        Parameters:
+            name (str): The name the artifact is cached under.
+            builder (callable): Called with the shared frame on first use.
+        """
+        return self._cache._artifact(self._entry, name, builder)
+
+    def release(self):
+        """Release the reference so the dataset becomes evictable."""
+        self._finalizer()
+
+
+class DatasetCache:
+    """
+    Process-wide LRU cache of parsed datasets keyed by content hash.
+
+    Entries referenced by at least one handle are never evicted; when the cap
+    is exceeded, unreferenced entries are dropped in least-recently-used order.
+
+    Parameters:
+        max_bytes (int): The global memory cap for all cached datasets.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key, loader):
+        """
+        Return a handle to the dataset stored under `key`, loading it if needed.
+
+        Parameters:
+            key (str): The content hash of the dataset.
+            loader (callable): Called without arguments on a miss; returns the parsed
+                frame and a dict of artifacts produced while loading it.
+        """
+        with self._lock:
+            entry = self._checkout(key)
+            if entry is None:
+                load_lock = self._loading.setdefault(key, threading.Lock())
+
+        if entry is None:
+            # Only one session parses a given file; the others wait and share it
+            with load_lock:
+                with self._lock:
+                    entry = self._checkout(key)
+                if entry is None:
+                    try:
+                        frame, artifacts = loader()
+                    except BaseException:
+                        with self._lock:
+                            self._loading.pop(key, None)
+                        raise
+                    with self._lock:
+                        # Publishing the entry and retiring the load lock in one step
+                        # guarantees a late arrival finds one or the other
+                        entry = _Entry(key, frame, frame_nbytes(frame))
+                        entry.artifacts.update(artifacts)
+                        entry.nbytes += sum(_artifact_nbytes(value) for value in artifacts.values())
+                        entry.refcount = 1
+                        self._entries[key] = entry
+                        self._nbytes += entry.nbytes
+                        self._loading.pop(key, None)
+                        self._evict()
+
+        return DatasetHandle(self, entry)
+
+    def stats(self):
+        """Return a summary of the cache contents."""
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "in_use": sum(1 for entry in self._entries.values() if entry.refcount > 0),
+                "nbytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _checkout(self, key):
+        """Mark an existing entry as used and most recent. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.refcount += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def _artifact(self, entry, name, builder):
+        """Return a cached artifact of an entry, building it outside the lock on a miss."""
+        with self._lock:
+            if name in entry.artifacts:
+                return entry.artifacts[name]
+        value = builder(entry.frame)
+        with self._lock:
+            if name in entry.artifacts:
+                # Another session built it concurrently; keep the first copy
+                return entry.artifacts[name]
+            entry.artifacts[name] = value
+            nbytes = _artifact_nbytes(value)
+            entry.nbytes += nbytes
+            if self._entries.get(entry.key) is entry:
+                self._nbytes += nbytes
+                self._evict()
+        return value
+
+    def _release(self, entry):
+        """Drop one reference to an entry and evict if over the cap."""
+        with self._lock:
+            if self._entries.get(entry.key) is entry and entry.refcount > 0:
+                entry.refcount -= 1
+            self._evict()
+
+    def _evict(self):
+        """Evict unreferenced entries in LRU order until under the cap. Caller holds the lock."""
+        if self._nbytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.refcount == 0:
+                del self._entries[key]
+                self._nbytes -= entry.nbytes
+                if self._nbytes <= self.max_bytes:
+                    break
+
+
+@st.cache_resource
+def get_dataset_cache():
+    """Return the dataset cache shared by all sessions of this server process."""
+    return DatasetCache()
+
+
+def load_shared_dataset(uploaded_file, loader=load_dataset):
+    """
+    Return a handle to the shared dataset for the uploaded file.
+
+    The session keeps a single handle in `st.session_state`; uploading a
+    different file releases the previous dataset. Reruns with the same upload
+    reuse the handle without reading or hashing the file again.
+
+    Parameters:
+        uploaded_file (UploadedFile): The file returned by `st.file_uploader`.
+        loader (callable): Parses a file-like object into a dataframe and its ValidationReport.
+    """
+    file_id = getattr(uploaded_file, "file_id", None)
+    handle = st.session_state.get(SESSION_HANDLE_KEY)
+    if handle is not None and file_id is not None and st.session_state.get(SESSION_FILE_ID_KEY) == file_id:
+        return handle
+
+    data = uploaded_file.getvalue()
+    key = content_hash(data)
+    if handle is not None and handle.key == key:
+        st.session_state[SESSION_FILE_ID_KEY] = file_id
+        return handle
+
+    def load():
+        frame, report = loader(io.BytesIO(data))
+        return frame, {"validation": report}
+
+    release_session_dataset()
+    handle = get_dataset_cache().acquire(key, load)
+    st.session_state[SESSION_HANDLE_KEY] = handle
+    st.session_state[SESSION_FILE_ID_KEY] = file_id
+    return handle
+
+
+def release_session_dataset():
+    """Release the dataset held by the current session, if any."""
+    handle = st.session_state.pop(SESSION_HANDLE_KEY, None)
+    st.session_state.pop(SESSION_FILE_ID_KEY, None)
+    if handle is not None:
+        handle.release()
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_dtype, is_numeric_dtype
+from pandas.tseries.api import guess_datetime_format
+
+# Number of values inspected to infer the format of a column
+SAMPLE_SIZE = 1000
+
+# Explicit formats tried when the first value's guessed format does not fit the sample
+DATE_FORMATS = [
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y%m%d",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%b %d, %Y",
+]
+
+ISO_PATTERN = r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?\s*(?:Z|[+-]\d{2}:?\d{2})?"
+EPOCH_PATTERN = r"[+-]?\d{9,19}(?:\.\d+)?"
+UTC_OFFSET_PATTERN = r"\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})$"
+
+# Numeric directives handled by the fixed-width parser, with their widths and field names
+_FIXED_WIDTH_DIRECTIVES = {
+    "%Y": (4, "year"),
+    "%m": (2, "month"),
+    "%d": (2, "day"),
+    "%H": (2, "hour"),
+    "%M": (2, "minute"),
+    "%S": (2, "second"),
+}
+
+# Range of integers read as '%Y%m%d' dates rather than epoch seconds
+_YYYYMMDD_RANGE = (19000101, 21001231)
+
+# Largest magnitude of an epoch timestamp in each unit (about year 5000)
+_EPOCH_UNIT_LIMITS = [("s", 1e11), ("ms", 1e14), ("us", 1e17), ("ns", np.inf)]
+
+
+def _sample(series):
+    """Return up to SAMPLE_SIZE non-missing values spread evenly over the column, as strings."""
+    values = series.dropna()
+    if len(values) > SAMPLE_SIZE:
+        values = values.iloc[np.linspace(0, len(values) - 1, SAMPLE_SIZE).astype(int)]
+    return values.astype(str).str.strip()
+
+
+def infer_date_format(sample):
+    """
+    Return the first strptime format that parses every value of the sample, or None.
+
+    Parameters:
+        sample (pd.Series): Date strings from the column.
+    """
+    guessed = guess_datetime_format(sample.iloc[0])
+    for fmt in [guessed] + DATE_FORMATS:
+        if fmt is None:
+            continue
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            continue
+        return fmt
+    return None
+
+
+def _fixed_width_layout(fmt):
+    """Split a format into (offset, width, field) digit runs and (offset, byte) literals, or None if unsupported."""
+    fields, literals = [], []
+    offset = i = 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            directive = fmt[i:i + 2]
+            if directive not in _FIXED_WIDTH_DIRECTIVES:
+                return None
+            width, field = _FIXED_WIDTH_DIRECTIVES[directive]
+            fields.append((offset, width, field))
+            offset += width
+            i += 2
+        else:
+            if not fmt[i].isascii():
+                return None
+            literals.append((offset, ord(fmt[i])))
+            offset += 1
+            i += 1
+    return offset, fields, literals
+
+
+def _parse_fixed_width(series, fmt):
+    """
+    Parse zero-padded numeric dates (e.g. '%d/%m/%Y %H:%M') with array arithmetic on the raw bytes.
+
+    Returns None when the format is not purely numeric; values that do not
+    match the layout exactly become NaT.
+    """
+    layout = _fixed_width_layout(fmt)
+    if layout is None:
+        return None
+    width, fields, literals = layout
+
+    # One spare byte per value tells whether a string is longer than the layout
+    try:
+        raw = series.to_numpy(dtype=f"S{width + 1}")
+    except UnicodeEncodeError:
+        return None
+    chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(len(series), width + 1)
+
+    valid = (chars[:, width] == 0) & (chars[:, width - 1] != 0) & series.notna().to_numpy()
+    for offset, byte in literals:
+        valid &= chars[:, offset] == byte
+    parts = {}
+    for offset, field_width, field in fields:
+        run = chars[:, offset:offset + field_width].astype(np.int64) - ord("0")
+        valid &= ((run >= 0) & (run <= 9)).all(axis=1)
+        parts[field] = run @ (10 ** np.arange(field_width - 1, -1, -1))
+
+    # Invalid rows get a placeholder date and are masked afterwards
+    parts = {field: np.where(valid, values, 1) for field, values in parts.items()}
+    parts.setdefault("year", np.full(len(series), 1970))
+    parts.setdefault("month", np.ones(len(series), dtype=np.int64))
+    parts.setdefault("day", np.ones(len(series), dtype=np.int64))
+    dates = pd.to_datetime(pd.DataFrame(parts, index=series.index), errors="coerce")
+    return dates.where(valid)
+
+
+def _is_yyyymmdd(numbers):
+    """Whether every value of a numeric column is a whole number in the '%Y%m%d' range."""
+    values = numbers.dropna().to_numpy(dtype="float64")
+    low, high = _YYYYMMDD_RANGE
+    return len(values) > 0 and bool(((values >= low) & (values <= high) & (values % 1 == 0)).all())
+
+
+def _parse_yyyymmdd(numbers):
+    """Convert integers such as 20200131 to datetimes with array arithmetic; impossible dates become NaT."""
+    values = numbers.fillna(0).to_numpy(dtype="int64")
+    parts = pd.DataFrame({"year": values // 10000, "month": values // 100 % 100, "day": values % 100}, index=numbers.index)
+    return pd.to_datetime(parts, errors="coerce").where(numbers.notna())
+
+
+def _parse_epoch(numbers):
+    """Convert epoch numbers to datetimes, inferring the unit from their magnitude."""
+    magnitude = np.nanmax(np.abs(numbers.to_numpy(dtype="float64"))) if numbers.notna().any() else 0
+    unit = next(unit for unit, limit in _EPOCH_UNIT_LIMITS if magnitude < limit)
+    return pd.to_datetime(numbers, unit=unit, errors="coerce")
+
+
+def _is_dayfirst(fmt):
+    """Whether a format puts the day before the month."""
+    return "%d" in fmt and "%m" in fmt and fmt.index("%d") < fmt.index("%m")
+
+
+def _to_naive(dates, tz):
+    """Convert timezone-aware datetimes to naive wall-clock time in `tz`."""
+    return dates.dt.tz_convert(tz).dt.tz_localize(None)
+
+
+def parse_dates(series, tz="UTC"):
+    """
+    Parse a column of dates once, picking the fastest exact strategy for its contents.
+
+    - datetime columns are returned as they are;
+    - 8-digit whole numbers from 19000101 to 21001231 are '%Y%m%d' dates, as
+      pd.read_csv reads such columns as integers;
+    - other integers, floats and digit-only strings are epoch timestamps (s, ms, us or ns by magnitude);
+    - ISO 8601 strings use pandas' vectorized ISO parser;
+    - other strings are parsed with a fixed format inferred once from a sample,
+      using byte-level array arithmetic when the format is purely numeric.
+    Values the chosen strategy cannot parse fall back to per-element parsing.
+
+    Timestamps with a UTC offset are converted to naive wall-clock time in `tz`,
+    so every result is comparable with the naive dates from the date pickers;
+    when the sample mixes them with naive values, the two kinds are parsed separately.
+
+    Parameters:
+        series (pd.Series): The column to parse.
+        tz (str): The timezone offset-aware timestamps are converted to (default: 'UTC').
+
+    Returns:
+        pd.Series: A naive datetime64 series; unparseable values become NaT.
+    """
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return _to_naive(series, tz)
+    if is_datetime64_dtype(series.dtype):
+        return series
+    if is_numeric_dtype(series.dtype):
+        return _parse_yyyymmdd(series) if _is_yyyymmdd(series) else _parse_epoch(series)
+
+    sample = _sample(series)
+    if sample.empty:
+        return pd.to_datetime(series, errors="coerce")
+    if sample.str.fullmatch(EPOCH_PATTERN).all():
+        return _parse_epoch(pd.to_numeric(series, errors="coerce"))
+
+    sample_aware = sample.str.contains(UTC_OFFSET_PATTERN)
+    utc = bool(sample_aware.any())
+    if utc and not sample_aware.all():
+        # Parsed together, naive values would take the offset of another row
+        aware = series.notna() & series.astype(str).str.strip().str.contains(UTC_OFFSET_PATTERN)
+        if not aware[series.notna()].all():
+            dates = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+            dates[aware] = parse_dates(series[aware], tz)
+            dates[~aware] = parse_dates(series[~aware], tz)
+            return dates
+
+    fmt = "ISO8601" if sample.str.fullmatch(ISO_PATTERN).all() else infer_date_format(sample)
+    if fmt is None:
+        dates = pd.to_datetime(series, format="mixed", errors="coerce", utc=utc)
+    else:
+        dates = None if fmt == "ISO8601" else _parse_fixed_width(series, fmt)
+        fixed_width = dates is not None
+        if not fixed_width:
+            dates = pd.to_datetime(series, format=fmt, errors="coerce", utc=utc)
+        failed = dates.isna() & series.notna()
+        if failed.any() and fixed_width:
+            # Unpadded values such as '1/5/2020' still follow the format
+            dates[failed] = pd.to_datetime(series[failed], format=fmt, errors="coerce", utc=utc)
+            failed = dates.isna() & series.notna()
+        if failed.any():
+            dates[failed] = pd.to_datetime(
+                series[failed], format="mixed", dayfirst=_is_dayfirst(fmt), errors="coerce", utc=utc
+            )
+
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = _to_naive(dates, tz)
+    return dates
+
+
+def ensure_datetime(series):
+    """Return the column as datetimes, parsing it only if ingestion has not already done so."""
+    if is_datetime64_dtype(series.dtype):
+        return series
+    return parse_dates(series)
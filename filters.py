@@ -1,9 +1,19 @@
 import pandas as pd
 
-def filter_by_date(df, start_date, end_date):
-    """Filter the dataframe by a date range."""
-    df['date'] = pd.to_datetime(df['date'])
-    return df[(df['date'] >= pd.to_datetime(start_date)) & (df['date'] <= pd.to_datetime(end_date))]
+from date_parsing import ensure_datetime
+
+def filter_by_date(df, start_date, end_date, is_sorted=None):
+    """Filter the dataframe by a date range without modifying the input (`is_sorted` skips the order check)."""
+    dates = ensure_datetime(df['date'])
+    start, end = pd.to_datetime(start_date), pd.to_datetime(end_date)
+    if is_sorted is None:
+        is_sorted = dates.is_monotonic_increasing
+    if is_sorted:
+        # Sorted dates select a contiguous slice, which stays a view of the shared frame
+        start_row = dates.searchsorted(start, side="left")
+        end_row = dates.searchsorted(end, side="right")
+        return df.iloc[start_row:end_row]
+    return df[(dates >= start) & (dates <= end)]
 
 def filter_by_rows(df, start_row, end_row):
     """Filter the dataframe by row indices."""
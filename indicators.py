@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Indicators available from compute_indicators and the columns they need
+INDICATOR_COLUMNS = {
+    "ema": ["close"],
+    "macd": ["close"],
+    "rsi": ["close"],
+    "atr": ["high", "low", "close"],
+    "vwap": ["high", "low", "close", "volume"],
+    "volatility": ["close"],
+}
+
+
+def _ffill(x):
+    """Forward-fill NaNs in a float array (leading NaNs are kept)."""
+    valid = ~np.isnan(x)
+    idx = np.where(valid, np.arange(len(x)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = x[idx]
+    filled[: np.argmax(valid) if valid.any() else len(x)] = np.nan
+    return filled
+
+
+def _ewm(x, alpha):
+    """
+    Exponentially weighted mean seeded with the first valid value.
+
+    The recursion y[t] = alpha * x[t] + (1 - alpha) * y[t-1] runs as a
+    single IIR filter in C rather than a Python loop.
+    """
+    missing = np.isnan(x)
+    out = np.full(len(x), np.nan)
+    if missing.all():
+        return out
+    if missing.any():
+        x = _ffill(x)
+    first = np.argmax(~missing)
+    out[first:], _ = lfilter([alpha], [1.0, alpha - 1.0], x[first:], zi=[(1.0 - alpha) * x[first]])
+    return out
+
+
+class _Intermediates:
+    """Lazily computed arrays shared between indicators within one pass."""
+
+    def __init__(self, df):
+        self._df = df
+        self._cache = {}
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def column(self, name):
+        return self._get(name, lambda: self._df[name].to_numpy(dtype="float64"))
+
+    def prev_close(self):
+        def compute():
+            close = self.column("close")
+            return np.r_[np.nan, close[:-1]]
+        return self._get("prev_close", compute)
+
+    def close_diff(self):
+        return self._get("close_diff", lambda: self.column("close") - self.prev_close())
+
+    def true_range(self):
+        def compute():
+            high, low, prev_close = self.column("high"), self.column("low"), self.prev_close()
+            # fmax ignores the missing previous close on the first row
+            return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return self._get("true_range", compute)
+
+    def ema(self, span):
+        return self._get(("ema", span), lambda: _ewm(self.column("close"), 2.0 / (span + 1)))
+
+    def log_returns(self):
+        def compute():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.log(self.column("close") / self.prev_close())
+        return self._get("log_returns", compute)
+
+
+def _rolling_std(x, window):
+    """Rolling sample standard deviation from cumulative sums, NaN until the window fills."""
+    out = np.full(len(x), np.nan)
+    if len(x) < window or window < 2:
+        return out
+    valid = ~np.isnan(x)
+    # Centering first keeps the cumulative sums well conditioned on long series
+    centered = np.where(valid, x - np.nanmean(x), 0.0)
+    count = np.cumsum(np.r_[0, valid])
+    s1 = np.cumsum(np.r_[0.0, centered])
+    s2 = np.cumsum(np.r_[0.0, centered * centered])
+    n = count[window:] - count[:-window]
+    total = s1[window:] - s1[:-window]
+    squares = s2[window:] - s2[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (squares - total * total / n) / (n - 1)
+    out[window - 1:] = np.where(n == window, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return out
+
+
+def compute_indicators(
+    df,
+    indicators,
+    ema_span=20,
+    macd_spans=(12, 26, 9),
+    rsi_period=14,
+    atr_period=14,
+    volatility_window=20,
+    periods_per_year=252,
+):
+    """
+    Compute a set of technical indicators together in one vectorized pass.
+
+    Intermediates such as the previous close, true range, EMAs and log returns
+    are computed once and shared by every indicator that needs them.
+    Indicators whose input columns are missing from `df` are skipped.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe with 'close' and optionally 'high', 'low' and 'volume' columns, in time order.
+        indicators (iterable): Names from INDICATOR_COLUMNS.
+        ema_span (int): The span of the EMA indicator (default: 20).
+        macd_spans (tuple): The fast, slow and signal spans of MACD (default: (12, 26, 9)).
+        rsi_period (int): The Wilder smoothing period of RSI (default: 14).
+        atr_period (int): The Wilder smoothing period of ATR (default: 14).
+        volatility_window (int): The rolling window of the volatility (default: 20).
+        periods_per_year (int): Rows per year used to annualize the volatility (default: 252).
+
+    Returns:
+        pd.DataFrame: Indicator columns aligned with `df.index`.
+    """
+    unknown = set(indicators) - set(INDICATOR_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown indicators: {', '.join(sorted(unknown))}")
+
+    shared = _Intermediates(df)
+    result = {}
+    for name in indicators:
+        if not all(col in df.columns for col in INDICATOR_COLUMNS[name]):
+            continue
+
+        if name == "ema":
+            result["ema"] = shared.ema(ema_span)
+
+        elif name == "macd":
+            fast, slow, signal = macd_spans
+            macd = shared.ema(fast) - shared.ema(slow)
+            macd_signal = _ewm(macd, 2.0 / (signal + 1))
+            result["macd"] = macd
+            result["macd_signal"] = macd_signal
+            result["macd_hist"] = macd - macd_signal
+
+        elif name == "rsi":
+            diff = shared.close_diff()
+            avg_gain = _ewm(np.maximum(diff, 0.0), 1.0 / rsi_period)
+            avg_loss = _ewm(np.maximum(-diff, 0.0), 1.0 / rsi_period)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result["rsi"] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        elif name == "atr":
+            result["atr"] = _ewm(shared.true_range(), 1.0 / atr_period)
+
+        elif name == "vwap":
+            typical = (shared.column("high") + shared.column("low") + shared.column("close")) / 3.0
+            volume = np.nan_to_num(shared.column("volume"))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result["vwap"] = np.cumsum(np.nan_to_num(typical * volume)) / np.cumsum(volume)
+
+        elif name == "volatility":
+            result["volatility"] = _rolling_std(shared.log_returns(), volatility_window) * np.sqrt(periods_per_year)
+
+    return pd.DataFrame(result, index=df.index)
@@ -49,19 +49,21 @@ def get_moving_average(filtered_df, window):
 
 
 
-def calculate_and_display_kpis(filtered_df):
+def calculate_and_display_kpis(filtered_df, is_sorted=False):
     """
     Calculate and display key performance indicators (KPIs) for the stock dataset.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing the stock data with 'date', 'close', 'high', 'low', and 'volume' columns.
+        is_sorted (bool): Whether the rows are already in date order, as recorded by validation (default: False).
     """
     if "close" not in filtered_df.columns or "date" not in filtered_df.columns:
         st.error("The dataframe must contain 'date' and 'close' columns to calculate KPIs.")
         return
 
     # Ensure the dataframe is sorted by date
-    filtered_df = filtered_df.sort_values(by="date")
+    if not is_sorted:
+        filtered_df = filtered_df.sort_values(by="date")
 
     # Calculate KPIs
     latest_close = get_latest_closing_price(filtered_df)
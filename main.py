@@ -1,7 +1,12 @@
+import pandas as pd
 import streamlit as st
-from data_processing import read_csv, validate_columns
+from data_processing import REQUIRED_COLUMNS, validate_dataset
+from dataset_cache import load_shared_dataset, release_session_dataset
 from filters import filter_by_date, filter_by_rows, filter_by_columns
 from display import display_dataframe
+from indicators import compute_indicators
+from ohlc_pyramid import build_ohlc_pyramid, downsample_for_chart
+from render_scheduler import RenderScheduler
 from visualizations import *
 from kpis import *
 from user_inputs import get_date_range, get_row_range, get_required_columns
@@ -9,6 +14,10 @@ from user_inputs import get_date_range, get_row_range, get_required_columns
 # Set Streamlit layout to full width
 st.set_page_config(layout="wide")
 
+# Datasets are shared between sessions; copy-on-write keeps per-session
+# filters and chart columns from ever writing into the shared frames
+pd.set_option("mode.copy_on_write", True)
+
 # Title of the app (Centered)
 # st.markdown(
 #     """
@@ -23,17 +32,27 @@ uploaded_file = st.sidebar.file_uploader("Upload your CSV file", type=["csv"])
 
 if uploaded_file:
     try:
-        # Read the uploaded CSV file
-        df = read_csv(uploaded_file)
+        # Read the uploaded CSV file (parsed once and shared across sessions)
+        dataset = load_shared_dataset(uploaded_file)
+        df = dataset.frame
+
+        # Data-quality report computed while the file was ingested
+        required_columns = REQUIRED_COLUMNS
+        report = dataset.artifact("validation", lambda frame: validate_dataset(frame, required_columns))
+        if report.is_valid and report.issues():
+            st.warning("Data quality issues found: " + "; ".join(report.issues()))
+
+        if report.is_valid and report.has_dates:
+            # Multi-resolution OHLCV levels, built once per dataset
+            pyramid = dataset.artifact(
+                "ohlc_pyramid", lambda frame: build_ohlc_pyramid(frame, is_sorted=report.is_sorted)
+            )
 
-        # Required columns
-        required_columns = ["date", "close", "volume", "open", "high", "low"]
-        if validate_columns(df, required_columns):
             # Get date range from user
             start_date, end_date = get_date_range(df)
 
             # Filter dataframe by date
-            filtered_df = filter_by_date(df, start_date, end_date)
+            filtered_df = filter_by_date(df, start_date, end_date, is_sorted=report.is_sorted)
 
             # Get row range from user
             start_row, end_row = get_row_range(filtered_df)
@@ -44,11 +63,12 @@ if uploaded_file:
             # Get required columns from user
             selected_columns = get_required_columns(filtered_df, required_columns)
             filtered_df = filter_by_columns(filtered_df, selected_columns)
-            filtered_df['date'] = pd.to_datetime(filtered_df['date'])
+            # Long ranges are charted from the coarsest pyramid level that still fills the chart
+            ohlc_df = downsample_for_chart(pyramid, filtered_df)
             # Format 'date' column to show only the date (YYYY-MM-DD)
             filtered_df['date'] = filtered_df['date'].dt.strftime('%Y-%m-%d')
 
-            calculate_and_display_kpis(filtered_df)
+            calculate_and_display_kpis(filtered_df, is_sorted=report.is_sorted)
 
             if "date" not in selected_columns:
                 st.error("The 'date' column must be selected for plotting.")
@@ -79,55 +99,113 @@ if uploaded_file:
                 coorelation_heatmap = st.toggle("Correlation Heatmap")
 
    
-            col1, col2 = st.columns([1,1])
+            col1, col2, col3, col4, col5 = st.columns([1,1,1,1,1])
             with col1:
                 ohlc_bar_chart = st.toggle("OHLC Bar Chart")    
             with col2:
-                pass
+                ema_vwap_chart = st.toggle("EMA & VWAP Chart")
+            with col3:
+                rsi_chart = st.toggle("RSI Chart")
+            with col4:
+                macd_chart = st.toggle("MACD Chart")
+            with col5:
+                atr_chart = st.toggle("ATR Chart")
+
+            col1, col2 = st.columns([1,1])
+            with col1:
+                volatility_chart = st.toggle("Rolling Volatility Chart")
+            with col2:
+                correlation_window = st.number_input(
+                    "Correlation Window (rows)", min_value=0, value=0, step=10,
+                    help="Correlate trailing windows of this many rows; 0 uses the whole selection.",
+                )
             
             st.divider()
 
+            # Compute the indicators of all enabled indicator charts in one pass
+            enabled_indicators = [
+                name
+                for name, enabled in [
+                    ("ema", ema_vwap_chart),
+                    ("vwap", ema_vwap_chart),
+                    ("rsi", rsi_chart),
+                    ("macd", macd_chart),
+                    ("atr", atr_chart),
+                    ("volatility", volatility_chart),
+                ]
+                if enabled
+            ]
+            indicators_df = compute_indicators(filtered_df, enabled_indicators)
+
+            # Register every enabled chart; each is built when it is displayed below
+            charts = RenderScheduler()
+            chart_builds = [
+                (ohlc_bar_chart, "ohlc_bar", build_ohlc_bar_chart_with_labels, (ohlc_df,), {}),
+                (volume_density, "volume_density", build_volume_density_chart, (filtered_df,), {}),
+                (coorelation_heatmap, "correlation_heatmap", build_correlation_heatmap, (filtered_df,), {"window": correlation_window or None}),
+                (volume_bar_chart, "volume_bar", build_volume_bar_chart, (ohlc_df,), {}),
+                (scatter_plot, "scatter", build_scatter_plot, (filtered_df,), {"y_column": "close"}),
+                (moving_avg_chart, "moving_average", build_moving_average_chart, (filtered_df,), {"window": 14}),
+                (bollinger_bands_cahrt, "bollinger_bands", build_bollinger_bands_chart, (filtered_df,), {"window": 20, "std_dev": 2}),
+                (volume_price_chart, "volume_price", build_volume_price_chart, (ohlc_df,), {}),
+                (high_low_range_area_chart, "high_low_range", build_high_low_range_area_chart, (ohlc_df,), {}),
+                (line_chart, "line", build_line_chart, (filtered_df,), {}),
+                (candlestick_chart, "candlestick", build_candlestick_chart, (ohlc_df,), {}),
+                (ema_vwap_chart, "ema_vwap", build_ema_vwap_chart, (filtered_df, indicators_df), {}),
+                (rsi_chart, "rsi", build_rsi_chart, (filtered_df, indicators_df), {}),
+                (macd_chart, "macd", build_macd_chart, (filtered_df, indicators_df), {}),
+                (atr_chart, "atr", build_atr_chart, (filtered_df, indicators_df), {}),
+                (volatility_chart, "volatility", build_volatility_chart, (filtered_df, indicators_df), {}),
+            ]
+            for enabled, name, build, args, kwargs in chart_builds:
+                if enabled:
+                    charts.submit(name, build, *args, **kwargs)
+
             # Display dataframe
             display_dataframe(filtered_df)
 
 
 
-            if ohlc_bar_chart:
-                plot_ohlc_bar_chart_with_labels(filtered_df)
+            # Build and display the charts in layout order
+            charts.show("ohlc_bar")
+
+            charts.show("volume_density")
+            charts.show("correlation_heatmap")
 
-            if volume_density:
-                plot_volume_density_chart(filtered_df)
-            if coorelation_heatmap:
-                plot_correlation_heatmap(filtered_df)
+            col1, col2 = st.columns([1,1])
+            with col1:
+                charts.show("volume_bar")
+            with col2:
+                charts.show("scatter")
 
             col1, col2 = st.columns([1,1])
             with col1:
-                if volume_bar_chart:
-                    plot_volume_bar_chart(filtered_df)
+                charts.show("moving_average")
             with col2:
-                if scatter_plot:
-                    plot_scatter_plot(filtered_df, y_column="close")  
+                charts.show("bollinger_bands")
+
+            charts.show("volume_price")
+            charts.show("high_low_range")
 
             col1, col2 = st.columns([1,1])
             with col1:
-                if moving_avg_chart:
-                    plot_moving_average_chart(filtered_df, window=14)
+                charts.show("line")
             with col2:
-                if bollinger_bands_cahrt:
-                    plot_bollinger_bands_chart(filtered_df, window=20, std_dev=2)
+                charts.show("candlestick")
 
-            if volume_price_chart:
-                plot_volume_price_chart(filtered_df)                
-            if high_low_range_area_chart:
-                plot_high_low_range_area_chart(filtered_df)
+            col1, col2 = st.columns([1,1])
+            with col1:
+                charts.show("ema_vwap")
+            with col2:
+                charts.show("rsi")
 
             col1, col2 = st.columns([1,1])
             with col1:
-                if line_chart:
-                    plot_line_chart(filtered_df)
+                charts.show("macd")
             with col2:
-                if candlestick_chart:
-                    plot_candlestick_chart(filtered_df)   
+                charts.show("atr")
+
+            charts.show("volatility")
 
 
 
@@ -137,11 +215,14 @@ if uploaded_file:
 
 
 
+        elif report.is_valid:
+            st.error("The 'date' column contains no valid dates.")
         else:
             st.error(f"The file must have the following columns: {', '.join(required_columns)}")
     except Exception as e:
         st.error(str(e))
 else:
+    release_session_dataset()
     st.info("Please upload a CSV file using the sidebar.")
 
 
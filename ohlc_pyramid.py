@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from date_parsing import ensure_datetime
+
+# Pyramid resolutions, finest first, as (label, bucket width)
+PYRAMID_LEVELS = [
+    ("1m", pd.Timedelta(minutes=1)),
+    ("5m", pd.Timedelta(minutes=5)),
+    ("15m", pd.Timedelta(minutes=15)),
+    ("1h", pd.Timedelta(hours=1)),
+    ("1D", pd.Timedelta(days=1)),
+    ("1W", pd.Timedelta(weeks=1)),
+]
+
+# The epoch is a Thursday; shifting by three days starts weekly buckets on Mondays
+_WEEK_ORIGIN = pd.Timedelta(days=3).value
+
+# Maximum number of bars sent to a chart
+MAX_CHART_BARS = 2000
+
+
+class OHLCLevel:
+    """
+    One resolution of the pyramid, stored as parallel NumPy arrays sorted by time.
+
+    Parameters:
+        label (str): The resolution label (e.g. '1h').
+        time (np.ndarray): Bucket start times as int64 nanoseconds since the epoch.
+        open, high, low, close, volume (np.ndarray): The aggregated float64 values.
+    """
+
+    def __init__(self, label, time, open, high, low, close, volume):
+        self.label = label
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in (self.time, self.open, self.high, self.low, self.close, self.volume))
+
+    def aggregate(self, label, width):
+        """
+        Derive a coarser level in a single vectorized pass over this one.
+
+        Parameters:
+            label (str): The label of the new level.
+            width (pd.Timedelta): The bucket width of the new level.
+        """
+        if len(self) == 0:
+            return OHLCLevel(label, self.time, self.open, self.high, self.low, self.close, self.volume)
+        width = width.value
+        origin = _WEEK_ORIGIN if width % pd.Timedelta(weeks=1).value == 0 else 0
+        buckets = (self.time + origin) // width
+
+        # Rows are sorted by time, so each bucket is a contiguous run
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+
+        return OHLCLevel(
+            label,
+            buckets[starts] * width - origin,
+            self.open[starts],
+            np.fmax.reduceat(self.high, starts),
+            np.fmin.reduceat(self.low, starts),
+            self.close[ends],
+            np.add.reduceat(np.nan_to_num(self.volume), starts),
+        )
+
+    def to_frame(self, start_row=0, end_row=None):
+        """Return rows of the level as a dataframe with the app's column names."""
+        rows = slice(start_row, end_row)
+        return pd.DataFrame({
+            "date": pd.to_datetime(self.time[rows]),
+            "open": self.open[rows],
+            "high": self.high[rows],
+            "low": self.low[rows],
+            "close": self.close[rows],
+            "volume": self.volume[rows],
+        })
+
+
+class OHLCPyramid:
+    """
+    Pre-aggregated OHLCV levels of a dataset, from its native resolution up to weekly bars.
+
+    Parameters:
+        levels (list[OHLCLevel]): The levels, finest first.
+    """
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def select(self, start, end, max_bars=MAX_CHART_BARS):
+        """
+        Pick the finest level whose bars in [start, end] fit in `max_bars`.
+
+        Returns the level and the row range of the visible bars, starting at the
+        bar containing `start`; the lookup is a binary search per level,
+        independent of the dataset size.
+        """
+        start, end = pd.Timestamp(start).value, pd.Timestamp(end).value
+        for level in self.levels:
+            start_row = max(np.searchsorted(level.time, start, side="right") - 1, 0)
+            end_row = np.searchsorted(level.time, end, side="right")
+            if end_row - start_row <= max_bars:
+                break
+        return level, start_row, end_row
+
+    def window(self, start, end, max_bars=MAX_CHART_BARS):
+        """Return the visible bars of the selected level as a dataframe."""
+        level, start_row, end_row = self.select(start, end, max_bars)
+        return level.to_frame(start_row, end_row)
+
+
+def build_ohlc_pyramid(df, is_sorted=False):
+    """
+    Build the OHLCV pyramid for a dataframe with 'date', 'open', 'high', 'low', 'close' and 'volume' columns.
+
+    The raw rows are bucketed into the first level at least as coarse as
+    their median spacing; every further level is derived from the previous one.
+    Rows already in date order (`is_sorted`, as recorded by validation) skip the sort.
+    """
+    dates = ensure_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")
+    # Rows whose date could not be parsed are left out of the pyramid
+    order = np.flatnonzero(~np.isnat(dates))
+    time = dates.view("int64")
+    if not is_sorted:
+        order = order[np.argsort(time[order], kind="stable")]
+    columns = {
+        col: df[col].to_numpy(dtype="float64")[order]
+        for col in ["open", "high", "low", "close", "volume"]
+    }
+    raw = OHLCLevel("raw", time[order], **columns)
+
+    spacing = np.median(np.diff(raw.time)) if len(raw) > 1 else 0
+    first = next(
+        (i for i, (_, width) in enumerate(PYRAMID_LEVELS) if width.value >= spacing),
+        len(PYRAMID_LEVELS) - 1,
+    )
+
+    levels = []
+    level = raw
+    for label, width in PYRAMID_LEVELS[first:]:
+        level = level.aggregate(label, width)
+        levels.append(level)
+    return OHLCPyramid(levels)
+
+
+def downsample_for_chart(pyramid, filtered_df, max_bars=MAX_CHART_BARS):
+    """
+    Return the data to chart for the filtered rows.
+
+    Small selections are charted as-is; larger ones are served from the
+    pyramid level covering the same date range, restricted to the selected columns.
+
+    Parameters:
+        pyramid (OHLCPyramid): The pyramid of the full dataset.
+        filtered_df (pd.DataFrame): The filtered dataframe with a datetime 'date' column.
+        max_bars (int): The maximum number of bars to chart.
+    """
+    if len(filtered_df) <= max_bars or "date" not in filtered_df.columns:
+        return filtered_df
+    view = pyramid.window(filtered_df["date"].min(), filtered_df["date"].max(), max_bars)
+    return view[[col for col in filtered_df.columns if col in view.columns]]
@@ -0,0 +1,45 @@
+import streamlit as st
+
+
+def _build(build, args, kwargs):
+    """Run a chart builder, returning (figure, None) or (None, validation message)."""
+    try:
+        return build(*args, **kwargs), None
+    except ValueError as e:
+        return None, str(e)
+
+
+class RenderScheduler:
+    """
+    Collects the enabled charts and builds each one when it is displayed, in layout order.
+
+    Figures are built on the script thread right before they are written, so
+    each chart appears as soon as it is ready. Plotly figure construction and
+    the JSON encoding inside `st.plotly_chart` both hold the GIL, so building
+    in a thread pool measured slower than this serial order.
+    """
+
+    def __init__(self):
+        self._builds = {}
+
+    def submit(self, name, build, *args, **kwargs):
+        """
+        Register a chart to build when it is shown.
+
+        Parameters:
+            name (str): The name used to display the chart with `show`.
+            build (callable): A chart builder from visualizations.py.
+            *args, **kwargs: The builder's arguments.
+        """
+        self._builds[name] = (build, args, kwargs)
+
+    def show(self, name):
+        """Build and display a submitted chart, or its validation error. Charts that were not submitted are skipped."""
+        submitted = self._builds.pop(name, None)
+        if submitted is None:
+            return
+        fig, error = _build(*submitted)
+        if error is not None:
+            st.error(error)
+            return
+        st.plotly_chart(fig, use_container_width=True)
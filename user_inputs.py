@@ -1,13 +1,12 @@
 import streamlit as st
-import pandas as pd
 
 def get_date_range(df):
-    """Allow the user to select a date range using date pickers."""
+    """Allow the user to select a date range using date pickers (dates are parsed at ingest)."""
     col1, col2 = st.sidebar.columns(2)
     with col1:
-        start_date = st.date_input("Start Date", value=pd.to_datetime(df['date'].min()))
+        start_date = st.date_input("Start Date", value=df['date'].min())
     with col2:
-        end_date = st.date_input("End Date", value=pd.to_datetime(df['date'].max()))
+        end_date = st.date_input("End Date", value=df['date'].max())
     return start_date, end_date
 
 def get_row_range(filtered_df):
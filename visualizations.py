@@ -1,11 +1,23 @@
+import numpy as np
 import plotly.express as px
-import streamlit as st
 import plotly.graph_objects as go
 
+from correlation import TICKER_COLUMNS, correlation_frame, returns_matrix, rolling_correlation_frames
 
-def plot_line_chart(filtered_df):
+# Chart builders return a plotly figure and raise ValueError when required
+# columns are missing. They never call Streamlit or modify their input, so
+# render_scheduler.py decides where and when each figure is displayed.
+
+# Largest heatmap (series per side) that still shows the value in every cell
+HEATMAP_MAX_LABELED_SERIES = 25
+
+# Number of trailing windows a rolling correlation heatmap lets the user step through
+HEATMAP_ROLLING_FRAMES = 20
+
+
+def build_line_chart(filtered_df):
     """
-    Create and display a line chart using the filtered dataframe.
+    Create a line chart using the filtered dataframe.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe with selected and filtered columns.
@@ -23,17 +35,16 @@ def plot_line_chart(filtered_df):
         title="Interactive Line Chart"
     )
     
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
 
 
 
-def plot_candlestick_chart(filtered_df):
+def build_candlestick_chart(filtered_df):
     """
-    Create and display a candlestick chart using the filtered dataframe.
+    Create a candlestick chart using the filtered dataframe.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date', 'open', 'high', 'low', and 'close' columns.
@@ -41,8 +52,7 @@ def plot_candlestick_chart(filtered_df):
     # Ensure the required columns are available
     required_columns = ["date", "open", "high", "low", "close"]
     if not all(col in filtered_df.columns for col in required_columns):
-        st.error("The dataframe must contain 'date', 'open', 'high', 'low', and 'close' columns for a candlestick chart.")
-        return
+        raise ValueError("The dataframe must contain 'date', 'open', 'high', 'low', and 'close' columns for a candlestick chart.")
 
     # Create the candlestick chart
     fig = go.Figure(
@@ -66,24 +76,22 @@ def plot_candlestick_chart(filtered_df):
         template="plotly_white",
     )
     
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
 
 
-def plot_volume_density_chart(filtered_df):
+def build_volume_density_chart(filtered_df):
     """
-    Create and display a density chart for the 'volume' column.
+    Create a density chart for the 'volume' column.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe with the 'volume' column.
     """
     # Ensure the 'volume' column is available
     if "volume" not in filtered_df.columns:
-        st.error("The 'volume' column is required for the density chart.")
-        return
+        raise ValueError("The 'volume' column is required for the density chart.")
 
     # Create the density chart
     fig = px.density_contour(
@@ -98,22 +106,20 @@ def plot_volume_density_chart(filtered_df):
     fig.update_traces(contours_coloring="fill", contours_showlabels=True)
     fig.update_layout(template="plotly_white")
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
-def plot_volume_bar_chart(filtered_df):
+def build_volume_bar_chart(filtered_df):
     """
-    Create and display a bar chart for the trading volume.
+    Create a bar chart for the trading volume.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date' and 'volume' columns.
     """
     # Ensure the required columns are available
     if "date" not in filtered_df.columns or "volume" not in filtered_df.columns:
-        st.error("The dataframe must contain 'date' and 'volume' columns for the volume bar chart.")
-        return
+        raise ValueError("The dataframe must contain 'date' and 'volume' columns for the volume bar chart.")
 
     # Create the bar chart
     fig = px.bar(
@@ -131,15 +137,14 @@ def plot_volume_bar_chart(filtered_df):
         yaxis_title="Volume",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
 
-def plot_ohlc_bar_chart_with_labels(filtered_df):
+def build_ohlc_bar_chart_with_labels(filtered_df):
     """
-    Create and display an OHLC bar chart with labels for open, high, low, and close values.
+    Create an OHLC bar chart with labels for open, high, low, and close values.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date', 'open', 'high', 'low', and 'close' columns.
@@ -147,8 +152,7 @@ def plot_ohlc_bar_chart_with_labels(filtered_df):
     # Ensure the required columns are available
     required_columns = ["date", "open", "high", "low", "close"]
     if not all(col in filtered_df.columns for col in required_columns):
-        st.error("The dataframe must contain 'date', 'open', 'high', 'low', and 'close' columns for the OHLC bar chart.")
-        return
+        raise ValueError("The dataframe must contain 'date', 'open', 'high', 'low', and 'close' columns for the OHLC bar chart.")
 
     # Create the OHLC bar chart
     fig = go.Figure(
@@ -179,14 +183,13 @@ def plot_ohlc_bar_chart_with_labels(filtered_df):
         xaxis_rangeslider_visible=False,  # Disable range slider for a cleaner view
     )
     
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
-def plot_moving_average_chart(filtered_df, window=7):
+def build_moving_average_chart(filtered_df, window=7):
     """
-    Create and display a moving average line chart for the 'close' price.
+    Create a moving average line chart for the 'close' price.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
@@ -194,11 +197,10 @@ def plot_moving_average_chart(filtered_df, window=7):
     """
     # Ensure the required columns are available
     if "date" not in filtered_df.columns or "close" not in filtered_df.columns:
-        st.error("The dataframe must contain 'date' and 'close' columns for the moving average chart.")
-        return
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the moving average chart.")
 
-    # Calculate the moving average
-    filtered_df["moving_average"] = filtered_df["close"].rolling(window=window).mean()
+    # Calculate the moving average (on a new frame, leaving the input untouched)
+    filtered_df = filtered_df.assign(moving_average=filtered_df["close"].rolling(window=window).mean())
 
     # Create the line chart
     fig = px.line(
@@ -216,14 +218,13 @@ def plot_moving_average_chart(filtered_df, window=7):
         legend_title="Metrics",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
-def plot_volume_price_chart(filtered_df):
+def build_volume_price_chart(filtered_df):
     """
-    Create and display a dual-axis chart showing close price and trading volume.
+    Create a dual-axis chart showing close price and trading volume.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date', 'close', and 'volume' columns.
@@ -231,8 +232,7 @@ def plot_volume_price_chart(filtered_df):
     # Ensure the required columns are available
     required_columns = ["date", "close", "volume"]
     if not all(col in filtered_df.columns for col in required_columns):
-        st.error("The dataframe must contain 'date', 'close', and 'volume' columns for this chart.")
-        return
+        raise ValueError("The dataframe must contain 'date', 'close', and 'volume' columns for this chart.")
 
     # Create the figure
     fig = go.Figure()
@@ -287,14 +287,13 @@ def plot_volume_price_chart(filtered_df):
         template="plotly_white",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
-def plot_bollinger_bands_chart(filtered_df, window=20, std_dev=2):
+def build_bollinger_bands_chart(filtered_df, window=20, std_dev=2):
     """
-    Create and display a Bollinger Bands chart with the close price and volatility bands.
+    Create a Bollinger Bands chart with the close price and volatility bands.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
@@ -303,13 +302,17 @@ def plot_bollinger_bands_chart(filtered_df, window=20, std_dev=2):
     """
     # Ensure the required columns are available
     if "date" not in filtered_df.columns or "close" not in filtered_df.columns:
-        st.error("The dataframe must contain 'date' and 'close' columns for the Bollinger Bands chart.")
-        return
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the Bollinger Bands chart.")
 
     # Calculate the moving average and Bollinger Bands
-    filtered_df["moving_average"] = filtered_df["close"].rolling(window=window).mean()
-    filtered_df["upper_band"] = filtered_df["moving_average"] + (filtered_df["close"].rolling(window=window).std() * std_dev)
-    filtered_df["lower_band"] = filtered_df["moving_average"] - (filtered_df["close"].rolling(window=window).std() * std_dev)
+    rolling_close = filtered_df["close"].rolling(window=window)
+    moving_average = rolling_close.mean()
+    band_width = rolling_close.std() * std_dev
+    filtered_df = filtered_df.assign(
+        moving_average=moving_average,
+        upper_band=moving_average + band_width,
+        lower_band=moving_average - band_width,
+    )
 
     # Create the Bollinger Bands chart
     fig = px.line(
@@ -327,13 +330,12 @@ def plot_bollinger_bands_chart(filtered_df, window=20, std_dev=2):
         legend_title="Metrics",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_high_low_range_area_chart(filtered_df):
+def build_high_low_range_area_chart(filtered_df):
     """
-    Create and display a high-low range area chart.
+    Create a high-low range area chart.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'date', 'high', and 'low' columns.
@@ -341,8 +343,7 @@ def plot_high_low_range_area_chart(filtered_df):
     # Ensure the required columns are available
     required_columns = ["date", "high", "low"]
     if not all(col in filtered_df.columns for col in required_columns):
-        st.error("The dataframe must contain 'date', 'high', and 'low' columns for the high-low range area chart.")
-        return
+        raise ValueError("The dataframe must contain 'date', 'high', and 'low' columns for the high-low range area chart.")
 
     # Create the area chart
     fig = go.Figure()
@@ -379,14 +380,13 @@ def plot_high_low_range_area_chart(filtered_df):
         legend_title="Metrics",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
-def plot_scatter_plot(filtered_df, y_column="close"):
+def build_scatter_plot(filtered_df, y_column="close"):
     """
-    Create and display a scatter plot for volume vs. a selected price metric.
+    Create a scatter plot for volume vs. a selected price metric.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing 'volume' and the selected y-axis column.
@@ -394,8 +394,7 @@ def plot_scatter_plot(filtered_df, y_column="close"):
     """
     # Ensure the required columns are available
     if "volume" not in filtered_df.columns or y_column not in filtered_df.columns:
-        st.error(f"The dataframe must contain 'volume' and '{y_column}' columns for the scatter plot.")
-        return
+        raise ValueError(f"The dataframe must contain 'volume' and '{y_column}' columns for the scatter plot.")
 
     # Create the scatter plot
     fig = px.scatter(
@@ -416,71 +415,271 @@ def plot_scatter_plot(filtered_df, y_column="close"):
         legend_title="Price",
     )
 
-    # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
 
 
-def plot_correlation_heatmap(filtered_df):
+def build_correlation_heatmap(filtered_df, window=None):
     """
-    Create and display an enhanced correlation heatmap for numerical columns (Low, High, Open, Close, Volume).
+    Create an enhanced correlation heatmap.
+
+    Single-asset data correlates the numerical columns (Low, High, Open, Close, Volume);
+    multi-asset data with a 'ticker' or 'symbol' column correlates the returns of every ticker.
+    Series are ordered by hierarchical clustering, and cell values are only drawn
+    for matrices up to HEATMAP_MAX_LABELED_SERIES series.
+
+    With a `window`, the heatmap shows the latest trailing window and a slider
+    steps back through up to HEATMAP_ROLLING_FRAMES earlier windows, all
+    computed in one incremental pass.
 
     Parameters:
         filtered_df (pd.DataFrame): The dataframe containing the numerical columns for correlation.
+        window (int): Correlate trailing windows of this many rows, if given (default: None).
     """
-    # Select numerical columns for correlation
-    correlation_columns = ["low", "high", "open", "close", "volume"]
-    available_columns = [col for col in correlation_columns if col in filtered_df.columns]
+    ticker_column = next((col for col in TICKER_COLUMNS if col in filtered_df.columns), None)
+    if ticker_column is not None and "date" in filtered_df.columns and "close" in filtered_df.columns:
+        # Multi-asset data: correlate the returns of each ticker
+        correlation_data = returns_matrix(filtered_df, ticker_column)
+        available_columns = list(correlation_data.columns)
+        row_labels = correlation_data.index
+        title = "Correlation Heatmap of Returns"
+    else:
+        # Select numerical columns for correlation
+        correlation_columns = ["low", "high", "open", "close", "volume"]
+        correlation_data = filtered_df
+        available_columns = [col for col in correlation_columns if col in filtered_df.columns]
+        row_labels = filtered_df["date"] if "date" in filtered_df.columns else filtered_df.index
+        title = "Enhanced Correlation Heatmap"
 
     # Ensure there are enough columns to compute correlations
     if len(available_columns) < 2:
-        st.error("The dataframe must contain at least two numerical columns (low, high, open, close, volume) for the correlation heatmap.")
-        return
-
-    # Compute the correlation matrix
-    correlation_matrix = filtered_df[available_columns].corr()
+        raise ValueError("The dataframe must contain at least two numerical columns (low, high, open, close, volume) for the correlation heatmap.")
 
-    # Create the heatmap
+    # Compute the clustered correlation matrices; selections shorter than the window use every row
+    frames = []
+    if window:
+        frames = rolling_correlation_frames(
+            correlation_data, available_columns, window, HEATMAP_ROLLING_FRAMES, labels=row_labels
+        )
+    if frames:
+        correlation_matrix = frames[-1][1]
+        title = f"{title} ({window}-row window)"
+    else:
+        correlation_matrix = correlation_frame(correlation_data, available_columns)
+    labels = [str(col) for col in correlation_matrix.columns]
+    show_values = len(labels) <= HEATMAP_MAX_LABELED_SERIES
+
+    # Create the heatmap; cell values are drawn by the trace itself rather than per-cell annotations
     fig = go.Figure(
         data=go.Heatmap(
             z=correlation_matrix.values,
-            x=available_columns,
-            y=available_columns,
+            x=labels,
+            y=labels,
             colorscale="RdBu",
             zmin=-1,
             zmax=1,
             colorbar=dict(title="Correlation"),
-            text=correlation_matrix.round(2).values,  # Show rounded correlation values on hover
-            hoverinfo="text+z",  # Show cell value and coordinates on hover
+            texttemplate="%{z:.2f}" if show_values else None,
+            textfont=dict(size=16, color="black"),
+            hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
         )
     )
 
+    if len(frames) > 1:
+        # Each slider step swaps in the matrix of one window, without a rerun
+        fig.frames = [go.Frame(data=[go.Heatmap(z=corr.values)], name=str(end)) for end, corr in frames]
+        fig.update_layout(
+            sliders=[dict(
+                active=len(frames) - 1,
+                currentvalue=dict(prefix="Window ending "),
+                steps=[
+                    dict(
+                        label=str(end),
+                        method="animate",
+                        args=[[str(end)], dict(mode="immediate", frame=dict(duration=0, redraw=True))],
+                    )
+                    for end, _ in frames
+                ],
+            )]
+        )
+
     # Customize layout
     fig.update_layout(
-        title="Enhanced Correlation Heatmap",
+        title=title,
         xaxis_title="Metrics",
         yaxis_title="Metrics",
         template="plotly_white",
         font=dict(size=14),  # General font size for the layout
     )
 
-    # Annotate the heatmap with larger text labels
-    annotations = []
-    for i, row in enumerate(correlation_matrix.values):
-        for j, value in enumerate(row):
-            annotations.append(
-                dict(
-                    x=available_columns[j],
-                    y=available_columns[i],
-                    text=f"{value:.2f}",  # Keep the value rounded to 2 decimal places
-                    showarrow=False,
-                    font=dict(size=16, color="black"),  # Increased font size for annotations
-                )
-            )
-    fig.update_layout(annotations=annotations)
+    return fig
+
 
-    # Display the heatmap in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
 
+def build_ema_vwap_chart(filtered_df, indicators_df):
+    """
+    Create a chart of the close price with its exponential moving average and VWAP.
+
+    Parameters:
+        filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
+        indicators_df (pd.DataFrame): The output of `compute_indicators` with 'ema' and/or 'vwap' columns.
+    """
+    # Ensure the required columns are available
+    if "date" not in filtered_df.columns or "close" not in filtered_df.columns:
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the EMA & VWAP chart.")
+
+    # Create the figure
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=filtered_df["date"], y=filtered_df["close"], name="Close", mode="lines"))
+    if "ema" in indicators_df.columns:
+        fig.add_trace(go.Scatter(x=filtered_df["date"], y=indicators_df["ema"], name="EMA", mode="lines"))
+    if "vwap" in indicators_df.columns:
+        fig.add_trace(go.Scatter(x=filtered_df["date"], y=indicators_df["vwap"], name="VWAP", mode="lines"))
+
+    # Customize layout
+    fig.update_layout(
+        title="EMA & VWAP",
+        xaxis_title="Date",
+        yaxis_title="Price",
+        template="plotly_white",
+        legend_title="Metrics",
+    )
+
+    return fig
+
+
+
+def build_rsi_chart(filtered_df, indicators_df):
+    """
+    Create a chart of the Relative Strength Index with overbought and oversold levels.
+
+    Parameters:
+        filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
+        indicators_df (pd.DataFrame): The output of `compute_indicators` with an 'rsi' column.
+    """
+    # Ensure the required columns are available
+    if "date" not in filtered_df.columns or "rsi" not in indicators_df.columns:
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the RSI chart.")
+
+    # Create the line chart
+    fig = go.Figure(go.Scatter(x=filtered_df["date"], y=indicators_df["rsi"], name="RSI", mode="lines"))
+    fig.add_hline(y=70, line_dash="dash", line_color="red")
+    fig.add_hline(y=30, line_dash="dash", line_color="green")
+
+    # Customize layout
+    fig.update_layout(
+        title="Relative Strength Index (RSI)",
+        xaxis_title="Date",
+        yaxis_title="RSI",
+        yaxis_range=[0, 100],
+        template="plotly_white",
+    )
+
+    return fig
+
+
+
+def build_macd_chart(filtered_df, indicators_df):
+    """
+    Create a chart of the MACD line, its signal line and histogram.
+
+    Parameters:
+        filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
+        indicators_df (pd.DataFrame): The output of `compute_indicators` with 'macd', 'macd_signal' and 'macd_hist' columns.
+    """
+    # Ensure the required columns are available
+    if "date" not in filtered_df.columns or "macd" not in indicators_df.columns:
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the MACD chart.")
+
+    # Create the figure
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=filtered_df["date"],
+            y=indicators_df["macd_hist"],
+            name="Histogram",
+            # A numeric color array with a two-color scale validates far faster than per-bar color names
+            marker=dict(
+                color=np.where(indicators_df["macd_hist"] < 0, 0, 1),
+                colorscale=[[0, "red"], [1, "green"]],
+                cmin=0,
+                cmax=1,
+            ),
+        )
+    )
+    fig.add_trace(go.Scatter(x=filtered_df["date"], y=indicators_df["macd"], name="MACD", mode="lines"))
+    fig.add_trace(go.Scatter(x=filtered_df["date"], y=indicators_df["macd_signal"], name="Signal", mode="lines"))
+
+    # Customize layout
+    fig.update_layout(
+        title="MACD (12, 26, 9)",
+        xaxis_title="Date",
+        yaxis_title="MACD",
+        template="plotly_white",
+        legend_title="Metrics",
+    )
+
+    return fig
+
+
+
+def build_atr_chart(filtered_df, indicators_df):
+    """
+    Create a chart of the Average True Range.
+
+    Parameters:
+        filtered_df (pd.DataFrame): The dataframe containing 'date', 'high', 'low', and 'close' columns.
+        indicators_df (pd.DataFrame): The output of `compute_indicators` with an 'atr' column.
+    """
+    # Ensure the required columns are available
+    if "date" not in filtered_df.columns or "atr" not in indicators_df.columns:
+        raise ValueError("The dataframe must contain 'date', 'high', 'low', and 'close' columns for the ATR chart.")
+
+    # Create the line chart
+    fig = go.Figure(go.Scatter(x=filtered_df["date"], y=indicators_df["atr"], name="ATR", mode="lines"))
+
+    # Customize layout
+    fig.update_layout(
+        title="Average True Range (ATR, 14)",
+        xaxis_title="Date",
+        yaxis_title="ATR",
+        template="plotly_white",
+    )
+
+    return fig
+
+
+
+def build_volatility_chart(filtered_df, indicators_df):
+    """
+    Create a chart of the annualized rolling volatility of log returns.
+
+    Parameters:
+        filtered_df (pd.DataFrame): The dataframe containing 'date' and 'close' columns.
+        indicators_df (pd.DataFrame): The output of `compute_indicators` with a 'volatility' column.
+    """
+    # Ensure the required columns are available
+    if "date" not in filtered_df.columns or "volatility" not in indicators_df.columns:
+        raise ValueError("The dataframe must contain 'date' and 'close' columns for the volatility chart.")
+
+    # Create the area chart
+    fig = go.Figure(
+        go.Scatter(
+            x=filtered_df["date"],
+            y=indicators_df["volatility"] * 100,
+            name="Volatility",
+            mode="lines",
+            fill="tozeroy",
+        )
+    )
+
+    # Customize layout
+    fig.update_layout(
+        title="Rolling Volatility (20, annualized)",
+        xaxis_title="Date",
+        yaxis_title="Volatility (%)",
+        template="plotly_white",
+    )
 
+    return fig